@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Usage log checks for the Knowledge Block Manager
+
+Exercises the cross-process usage log protocol: increments, saves and
+compaction from a second process, and an interrupted compaction.
+Run directly; exits non-zero on the first failed check.
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+
+from manager import KnowledgeBlockManager
+
+TOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def run_other_process(data_dir: str, code: str):
+    """Run code against a fresh manager (bound to `m`) in another interpreter."""
+    script = f"from manager import KnowledgeBlockManager\nm = KnowledgeBlockManager({data_dir!r})\n{code}"
+    subprocess.run([sys.executable, '-c', script], cwd=TOOL_DIR, check=True)
+
+def usage_count(data_dir: str, block_id: str) -> int:
+    """Read a block's usage count through a fresh manager."""
+    return KnowledgeBlockManager(data_dir).get_block(block_id)['usage_count']
+
+def check(label: str, actual, expected):
+    if actual != expected:
+        sys.exit(f"FAIL {label}: expected {expected}, got {actual}")
+    print(f"ok   {label}")
+
+def main():
+    with tempfile.TemporaryDirectory() as data_dir:
+        m = KnowledgeBlockManager(data_dir)
+        block_id = m.create_block({'id': 'x', 'title': 'X', 'domain': 'defense', 'type': 'case', 'content': 'x'})['id']
+
+        # Saving the copy increment_usage returns must not count the increment again
+        block = m.increment_usage(block_id)
+        block['content'] = 'edited'
+        m.create_block(block)
+        check("save after increment", usage_count(data_dir, block_id), 1)
+
+        # Increments from another process survive a save of an older copy
+        block = m.get_block(block_id)
+        run_other_process(data_dir, "m.increment_usage('x'); m.increment_usage('x')")
+        block['content'] = 'edited again'
+        m.create_block(block)
+        check("save after increments elsewhere", usage_count(data_dir, block_id), 3)
+
+        # A save from another process is picked up, with later increments on top
+        run_other_process(data_dir, "m.update_block('x', {'content': 'remote'})")
+        m.increment_usage(block_id)
+        check("save elsewhere", m.get_block(block_id)['content'], 'remote')
+        check("increment after save elsewhere", usage_count(data_dir, block_id), 4)
+
+        # Compaction in another process folds the log into the file
+        run_other_process(data_dir, "m.compact_usage()")
+        check("count after compaction elsewhere", m.get_block(block_id)['usage_count'], 4)
+        m.increment_usage(block_id)
+        check("increment after compaction", usage_count(data_dir, block_id), 5)
+
+        # A compaction that dies before swapping in the new log counts nothing twice
+        run_other_process(data_dir, (
+            "import os\n"
+            "replace = os.replace\n"
+            "def fail_log_swap(src, dst):\n"
+            "    if dst == m.usage_log_path:\n"
+            "        raise KeyboardInterrupt\n"
+            "    replace(src, dst)\n"
+            "os.replace = fail_log_swap\n"
+            "try:\n"
+            "    m.compact_usage()\n"
+            "except KeyboardInterrupt:\n"
+            "    pass\n"
+        ))
+        check("count after interrupted compaction", usage_count(data_dir, block_id), 5)
+        m.compact_usage()
+        check("count after finishing compaction", usage_count(data_dir, block_id), 5)
+
+if __name__ == "__main__":
+    main()
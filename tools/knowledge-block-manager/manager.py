@@ -5,21 +5,111 @@ Knowledge Block Manager for Creative-Career-OS
 This tool manages knowledge blocks with version control, search, and indexing capabilities.
 """
 
-import json
 import os
 import re
 import datetime
 import hashlib
+import time
 import argparse
-from typing import List, Dict, Any, Optional
+import atexit
+import bisect
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Sequence
+
+import orjson
+
+# Knowledge block domains, one directory each under data_dir
+_DOMAINS = ("defense", "proactive", "mindset", "efficiency", "relationship")
+_DOMAIN_SET = frozenset(_DOMAINS)
+
+# JSON schema type name -> (accepted Python types, description used in errors)
+_SCHEMA_TYPES = {
+    'string': ((str,), "a string"),
+    'number': ((int, float), "a number"),
+    'integer': ((int,), "an integer"),
+    'boolean': ((bool,), "a boolean"),
+    'array': ((list,), "an array"),
+    'object': ((dict,), "an object")
+}
+
+# Characters replaced when turning a title into an ID slug
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+# Word runs (including CJK) used as index terms
+_TOKEN_RE = re.compile(r'[\w\u4e00-\u9fff]+')
+
+def _tokenize(block: Dict[str, Any]) -> set:
+    """Extract the set of index terms from a block's title, content and tags."""
+    text = f"{block.get('title', '')} {block.get('content', '')} {' '.join(block.get('tags', []))}"
+    return set(_TOKEN_RE.findall(text.lower()))
+
+def _copy_block(block: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a block the way a write and read back would, non-string keys included."""
+    return orjson.loads(orjson.dumps(block, option=orjson.OPT_NON_STR_KEYS))
+
+# Maximum number of block files kept in the get_block read cache
+_READ_CACHE_SIZE = 512
+
+def _load_json_file(file_path: str) -> Optional[Dict[str, Any]]:
+    """Load a block file, returning None if it is missing or malformed."""
+    try:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+
+def _load_json_files(paths: List[str]) -> List[Dict[str, Any]]:
+    """Load block files, skipping unreadable ones."""
+    blocks = []
+    for file_path in paths:
+        block = _load_json_file(file_path)
+        if block is not None:
+            blocks.append(block)
+    return blocks
+
+# Managers whose index is flushed at interpreter exit; held weakly so they
+# can still be garbage collected (a dropped flush only costs a re-sync)
+_live_managers = weakref.WeakSet()
+
+@atexit.register
+def _flush_live_managers():
+    for manager in list(_live_managers):
+        manager.flush_index()
 
 class KnowledgeBlockManager:
     def __init__(self, data_dir: str = "../knowledge_blocks"):
         """Initialize the knowledge block manager."""
         self.data_dir = os.path.abspath(data_dir)
         self.schema_path = os.path.join(os.path.dirname(__file__), "schema.json")
+        self.index_path = os.path.join(self.data_dir, "_index.json")
+        self.usage_log_path = os.path.join(self.data_dir, "_usage.log")
+        # term -> ascending doc numbers, kept as the on-disk space-separated
+        # string until a lookup or write needs the list
+        self._index: Optional[Dict[str, Any]] = None
+        # doc number -> [block_id, domain, mtime_ns, size] of the
+        # indexed file, or None once that file was re-indexed or removed
+        self._docs: List[Optional[list]] = []
+        # block ID -> its current doc number
+        self._doc_nums: Dict[str, int] = {}
+        self._index_dirty = False
+        self._buffer: Optional[Dict[str, Dict[str, Any]]] = None
+        # (raw file contents, mtime_ns, size) keyed by (domain, block_id), in LRU order
+        self._read_cache: OrderedDict = OrderedDict()
+        # How much of the usage log has been read: generation, file identity,
+        # byte offset, and the offsets of each block's increment lines
+        self._usage_gen: Optional[str] = None
+        self._usage_file: Optional[tuple] = None
+        self._usage_offset = 0
+        self._usage_positions: Dict[str, List[int]] = {}
+        # block ID -> (generation, offset) of the log already counted in the
+        # copy get_block last returned, in LRU order; a block whose mark was
+        # evicted is saved as counting the whole log read so far
+        self._usage_marks: OrderedDict = OrderedDict()
         self._ensure_dirs()
         self._load_schema()
+        _live_managers.add(self)
     
     def _ensure_dirs(self):
         """Ensure necessary directories exist."""
@@ -27,27 +117,33 @@ class KnowledgeBlockManager:
             os.makedirs(self.data_dir)
         
         # Create domain directories
-        domains = ["defense", "proactive", "mindset", "efficiency", "relationship"]
-        for domain in domains:
+        for domain in _DOMAINS:
             domain_dir = os.path.join(self.data_dir, domain)
             if not os.path.exists(domain_dir):
                 os.makedirs(domain_dir)
     
     def _load_schema(self):
         """Load the knowledge block schema."""
-        with open(self.schema_path, 'r', encoding='utf-8') as f:
-            self.schema = json.load(f)
+        with open(self.schema_path, 'rb') as f:
+            self.schema = orjson.loads(f.read())
+        
+        # Precompute validation checks so _validate_block is a tight loop
+        self._required = tuple(self.schema['required'])
+        self._type_checks = [
+            (field, _SCHEMA_TYPES[props['type']][0], f"Field {field} should be {_SCHEMA_TYPES[props['type']][1]}")
+            for field, props in self.schema['properties'].items()
+            if props.get('type') in _SCHEMA_TYPES
+        ]
     
     def generate_id(self, title: str) -> str:
         """Generate a unique ID for a knowledge block."""
         # Create a hash based on title and timestamp
-        timestamp = datetime.datetime.now().isoformat()
-        combined = f"{title}_{timestamp}"
-        hash_obj = hashlib.md5(combined.encode('utf-8'))
-        short_hash = hash_obj.hexdigest()[:8]
+        hash_obj = hashlib.blake2b(title.encode('utf-8'), digest_size=4)
+        hash_obj.update(time.monotonic_ns().to_bytes(8, 'little'))
+        short_hash = hash_obj.hexdigest()
         
         # Create a slug from title
-        slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+        slug = _SLUG_RE.sub('-', title.lower()).strip('-')
         slug = slug[:30]  # Limit length
         
         return f"{slug}_{short_hash}"
@@ -93,58 +189,222 @@ class KnowledgeBlockManager:
     def _validate_block(self, block_data: Dict[str, Any]):
         """Validate a knowledge block against the schema."""
         # Check required fields
-        required_fields = self.schema['required']
-        for field in required_fields:
+        for field in self._required:
             if field not in block_data:
                 raise ValueError(f"Missing required field: {field}")
         
+        if block_data['domain'] not in _DOMAIN_SET:
+            raise ValueError(f"Invalid domain: {block_data['domain']}")
+        
         # Check field types
-        properties = self.schema['properties']
-        for field, props in properties.items():
-            if field in block_data:
-                value = block_data[field]
-                if 'type' in props:
-                    expected_type = props['type']
-                    if expected_type == 'string' and not isinstance(value, str):
-                        raise ValueError(f"Field {field} should be a string")
-                    elif expected_type == 'number' and not isinstance(value, (int, float)):
-                        raise ValueError(f"Field {field} should be a number")
-                    elif expected_type == 'integer' and not isinstance(value, int):
-                        raise ValueError(f"Field {field} should be an integer")
-                    elif expected_type == 'boolean' and not isinstance(value, bool):
-                        raise ValueError(f"Field {field} should be a boolean")
-                    elif expected_type == 'array' and not isinstance(value, list):
-                        raise ValueError(f"Field {field} should be an array")
-                    elif expected_type == 'object' and not isinstance(value, dict):
-                        raise ValueError(f"Field {field} should be an object")
+        for field, expected_type, message in self._type_checks:
+            if field in block_data and not isinstance(block_data[field], expected_type):
+                raise ValueError(message)
+    
+    @contextmanager
+    def buffered(self):
+        """Defer block writes until the end of the block.
+        
+        Blocks saved inside the context are kept in memory and written once
+        on exit, so repeated updates to the same block cost a single write.
+        """
+        if self._buffer is not None:
+            # Already buffering; the outermost context flushes
+            yield
+            return
+        self._buffer = {}
+        try:
+            yield
+        finally:
+            buffer, self._buffer = self._buffer, None
+            for block_data in buffer.values():
+                self._write_to_disk(block_data)
     
     def _save_block(self, block_data: Dict[str, Any]):
-        """Save a knowledge block to disk."""
+        """Save a knowledge block, deferring the write while buffered."""
+        if self._buffer is not None:
+            self._buffer[block_data['id']] = block_data
+            return
+        self._write_to_disk(block_data)
+    
+    def _write_to_disk(self, block_data: Dict[str, Any]):
+        """Write a knowledge block to disk."""
         domain = block_data['domain']
         block_id = block_data['id']
         file_path = os.path.join(self.data_dir, domain, f"{block_id}.json")
         
+        # Record how much of the usage log the written usage_count includes
+        usage_mark = self._usage_marks.pop(block_id, None)
+        if usage_mark is None:
+            self._sync_usage()
+            usage_mark = (self._usage_gen, self._usage_offset)
+        
         # Save the block
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(block_data, f, ensure_ascii=False, indent=2)
+        data = orjson.dumps(
+            {**block_data, '_usage_log': usage_mark},
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+        # Replace the file in one step so concurrent readers never see a partial write
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+        st = os.stat(file_path)
+        self._cache_put((domain, block_id), data, st)
+        
+        # Keep a loaded search index in sync; otherwise the next load picks
+        # up the change from the file's mtime
+        if self._index is not None:
+            self._index_doc(block_id, domain, block_data, st)
+    
+    def _ensure_index(self):
+        """Load the inverted index on first use and sync it with the files on disk."""
+        if self._index is None:
+            try:
+                with open(self.index_path, 'rb') as f:
+                    data = orjson.loads(f.read())
+                self._index = data['postings']
+                self._docs = data['docs']
+            except (FileNotFoundError, orjson.JSONDecodeError, KeyError, TypeError):
+                self._index, self._docs = {}, []
+            self._doc_nums = {meta[0]: num for num, meta in enumerate(self._docs) if meta is not None}
+            
+            # Start over once retired doc numbers make up a sizeable share, or
+            # if the index was written with a different doc layout
+            if (len(self._docs) - len(self._doc_nums) > max(64, len(self._doc_nums) // 4)
+                    or any(meta is not None and len(meta) != 4 for meta in self._docs)):
+                self._index, self._docs, self._doc_nums = {}, [], {}
+        self._refresh_index()
+    
+    def _refresh_index(self):
+        """Re-index block files added, edited or removed since they were indexed."""
+        seen = set()
+        changed = []
+        for domain, entries in self._domain_entries(_DOMAINS).items():
+            for entry in entries:
+                block_id = entry.name[:-len('.json')]
+                st = entry.stat()
+                seen.add(block_id)
+                num = self._doc_nums.get(block_id)
+                meta = self._docs[num] if num is not None else None
+                if meta is None or meta[1] != domain or meta[2] != st.st_mtime_ns or meta[3] != st.st_size:
+                    changed.append((block_id, domain, entry.path, st))
+        
+        for block_id in [block_id for block_id in self._doc_nums if block_id not in seen]:
+            self._docs[self._doc_nums.pop(block_id)] = None
+            self._index_dirty = True
+        for block_id, domain, path, st in changed:
+            self._index_doc(block_id, domain, _load_json_file(path), st)
+    
+    def _postings(self, term: str) -> Optional[List[int]]:
+        """Get the doc numbers for a term, decoding them on first use."""
+        postings = self._index.get(term)
+        if isinstance(postings, str):
+            postings = self._index[term] = [int(num) for num in postings.split()]
+        return postings
+    
+    def _index_doc(self, block_id: str, domain: str, block: Optional[Dict[str, Any]], st: os.stat_result):
+        """Index a block file under a fresh doc number; a malformed file gets no terms."""
+        old_num = self._doc_nums.get(block_id)
+        if old_num is not None:
+            # Postings for the old number are skipped until the next full build
+            self._docs[old_num] = None
+        num = len(self._docs)
+        self._docs.append([block_id, domain, st.st_mtime_ns, st.st_size])
+        self._doc_nums[block_id] = num
+        if block:
+            for term in _tokenize(block):
+                postings = self._postings(term)
+                if postings is None:
+                    self._index[term] = [num]
+                else:
+                    postings.append(num)
+        self._index_dirty = True
+    
+    def rebuild_index(self):
+        """Rebuild the inverted index from the block files on disk."""
+        self._index, self._docs, self._doc_nums = {}, [], {}
+        self._refresh_index()
+        self._index_dirty = True
+    
+    def flush_index(self):
+        """Write the inverted index to disk if it has changed."""
+        if not self._index_dirty or self._index is None:
+            return
+        data = {
+            'docs': self._docs,
+            'postings': {
+                term: postings if isinstance(postings, str) else ' '.join(map(str, postings))
+                for term, postings in self._index.items()
+            }
+        }
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(data))
+            os.replace(tmp_path, self.index_path)
+        except FileNotFoundError:
+            # The data directory has gone away
+            return
+        self._index_dirty = False
     
     def get_block(self, block_id: str, domain: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Get a knowledge block by ID."""
+        if self._buffer is not None and block_id in self._buffer:
+            block = self._buffer[block_id]
+            if not domain or block['domain'] == domain:
+                # Hand out a copy so failed updates can't leak into the buffer
+                return _copy_block(block)
+        
         if domain:
-            file_path = os.path.join(self.data_dir, domain, f"{block_id}.json")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            if domain not in _DOMAIN_SET:
+                return None
+            domains = (domain,)
         else:
             # Search all domains
-            domains = ["defense", "proactive", "mindset", "efficiency", "relationship"]
-            for domain in domains:
-                file_path = os.path.join(self.data_dir, domain, f"{block_id}.json")
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        return json.load(f)
+            domains = _DOMAINS
+        
+        self._sync_usage()
+        for domain in domains:
+            key = (domain, block_id)
+            file_path = os.path.join(self.data_dir, domain, f"{block_id}.json")
+            try:
+                # A stat is enough to tell whether another writer changed the file
+                st = os.stat(file_path)
+            except FileNotFoundError:
+                self._read_cache.pop(key, None)
+                continue
+            cached = self._read_cache.get(key)
+            if cached is not None and cached[1:] == (st.st_mtime_ns, st.st_size):
+                data = cached[0]
+                self._read_cache.move_to_end(key)
+            else:
+                try:
+                    with open(file_path, 'rb') as f:
+                        # Stat before reading: if the file changes mid-read,
+                        # the next call sees a different stat and reads it again
+                        st = os.fstat(f.fileno())
+                        data = f.read()
+                except FileNotFoundError:
+                    continue
+                self._cache_put(key, data, st)
+            # The cache saves the open/read only; parsing on every call gives
+            # callers their own copy to mutate
+            block = self._apply_usage(orjson.loads(data))
+            self._usage_marks[block_id] = (self._usage_gen, self._usage_offset)
+            self._usage_marks.move_to_end(block_id)
+            if len(self._usage_marks) > _READ_CACHE_SIZE:
+                self._usage_marks.popitem(last=False)
+            return block
         return None
     
+    def _cache_put(self, key: tuple, data: bytes, st: os.stat_result):
+        """Store raw block file contents in the read cache, evicting the oldest."""
+        self._read_cache[key] = (data, st.st_mtime_ns, st.st_size)
+        self._read_cache.move_to_end(key)
+        if len(self._read_cache) > _READ_CACHE_SIZE:
+            self._read_cache.popitem(last=False)
+    
     def update_block(self, block_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update a knowledge block."""
         # Find the block
@@ -174,70 +434,112 @@ class KnowledgeBlockManager:
         if not block:
             return False
         
+        # Drop any pending write
+        was_buffered = self._buffer is not None and self._buffer.pop(block_id, None) is not None
+        
         # Delete the file
         domain = block['domain']
         file_path = os.path.join(self.data_dir, domain, f"{block_id}.json")
-        if os.path.exists(file_path):
+        self._read_cache.pop((domain, block_id), None)
+        self._usage_marks.pop(block_id, None)
+        try:
             os.remove(file_path)
-            return True
-        return False
+        except FileNotFoundError:
+            return was_buffered
+        if self._index is not None and block_id in self._doc_nums:
+            self._docs[self._doc_nums.pop(block_id)] = None
+            self._index_dirty = True
+        return True
+    
+    def _domain_entries(self, domains: Sequence[str]) -> Dict[str, List[os.DirEntry]]:
+        """List the block files of the given domains in one pass over data_dir."""
+        wanted = frozenset(domains)
+        found: Dict[str, List[os.DirEntry]] = {}
+        with os.scandir(self.data_dir) as domain_entries:
+            for domain_entry in domain_entries:
+                if domain_entry.name not in wanted or not domain_entry.is_dir():
+                    continue
+                with os.scandir(domain_entry.path) as entries:
+                    found[domain_entry.name] = [
+                        entry for entry in entries
+                        if entry.name.endswith('.json') and entry.is_file()
+                    ]
+        return found
+    
+    def _block_paths(self, domains: Sequence[str]) -> List[str]:
+        """List the block file paths in the given domains."""
+        found = self._domain_entries(domains)
+        # Keep results grouped in the requested domain order
+        return [entry.path for domain in domains for entry in found.get(domain, ())]
+    
+    def _scan_blocks(self, domains: Sequence[str]) -> List[Dict[str, Any]]:
+        """Load every block file in the given domains."""
+        self._sync_usage()
+        return [self._apply_usage(block) for block in _load_json_files(self._block_paths(domains))]
+    
+    def _search_candidates(self, query_terms: frozenset) -> set:
+        """Look up the doc numbers of blocks that may match all query terms.
+        
+        A block is a candidate when every query term is a substring of one of
+        its indexed terms. Each term is checked against the whole lexicon, so
+        lookup is linear in the number of distinct indexed terms.
+        """
+        self._ensure_index()
+        candidates = None
+        for term in query_terms:
+            # Substring match against the lexicon, so partial words (and CJK
+            # text, which has no spaces between words) still match
+            postings = set()
+            for indexed_term in self._index:
+                if term in indexed_term:
+                    postings.update(self._postings(indexed_term))
+            candidates = postings if candidates is None else candidates & postings
+            if not candidates:
+                break
+        return candidates
     
     def search_blocks(self, query: str, domain: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Search knowledge blocks."""
-        results = []
-        search_terms = query.lower().split()
+        """Search knowledge blocks.
+        
+        The query is split into word runs like the indexed text, so
+        punctuation separates terms: "c++" searches for "c" and "3.5" for
+        "3" and "5". A block matches when every term is a substring of one
+        of its indexed terms.
+        """
+        query_terms = frozenset(_TOKEN_RE.findall(query.lower()))
         
         if domain:
-            domains = [domain]
+            if domain not in _DOMAIN_SET:
+                return []
+            domains = (domain,)
         else:
-            domains = ["defense", "proactive", "mindset", "efficiency", "relationship"]
+            domains = _DOMAINS
         
-        for domain in domains:
-            domain_dir = os.path.join(self.data_dir, domain)
-            if not os.path.exists(domain_dir):
-                continue
-            
-            for filename in os.listdir(domain_dir):
-                if not filename.endswith('.json'):
-                    continue
-                
-                file_path = os.path.join(domain_dir, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    try:
-                        block = json.load(f)
-                    except json.JSONDecodeError:
-                        continue
-                
-                # Search in title, content, tags
-                search_text = f"{block.get('title', '').lower()} {block.get('content', '').lower()} {' '.join(block.get('tags', []))}"
-                
-                # Check if all search terms are present
-                if all(term in search_text for term in search_terms):
-                    results.append(block)
-        
-        return results
-    
-    def get_blocks_by_domain(self, domain: str) -> List[Dict[str, Any]]:
-        """Get all knowledge blocks in a domain."""
-        results = []
-        domain_dir = os.path.join(self.data_dir, domain)
+        if not query_terms:
+            # A blank query lists everything; one with no word characters
+            # (e.g. only punctuation) can't match any indexed term
+            return [] if query.strip() else self._scan_blocks(domains)
         
-        if not os.path.exists(domain_dir):
-            return results
+        candidates = self._search_candidates(query_terms)
         
-        for filename in os.listdir(domain_dir):
-            if not filename.endswith('.json'):
-                continue
-            
-            file_path = os.path.join(domain_dir, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                try:
-                    block = json.load(f)
-                    results.append(block)
-                except json.JSONDecodeError:
-                    continue
+        # Only load the files the index points at, skipping retired doc numbers
+        found: Dict[str, List[str]] = {}
+        for num in sorted(candidates):
+            meta = self._docs[num]
+            if meta is not None:
+                found.setdefault(meta[1], []).append(os.path.join(self.data_dir, meta[1], f"{meta[0]}.json"))
+        # Keep results grouped in the requested domain order, like _block_paths
+        paths = [path for domain in domains for path in found.get(domain, ())]
         
-        return results
+        # The index was just synced with the files, so candidates are exact
+        self._sync_usage()
+        return [self._apply_usage(block) for block in _load_json_files(paths)]
+    
+    def get_blocks_by_domain(self, domain: str) -> List[Dict[str, Any]]:
+        """Get all knowledge blocks in a domain."""
+        if domain not in _DOMAIN_SET:
+            return []
+        return self._scan_blocks((domain,))
     
     def add_feedback(self, block_id: str, feedback: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Add feedback to a knowledge block."""
@@ -264,52 +566,146 @@ class KnowledgeBlockManager:
         return block
     
     def increment_usage(self, block_id: str) -> Optional[Dict[str, Any]]:
-        """Increment usage count for a knowledge block."""
+        """Increment usage count for a knowledge block.
+        
+        The increment is appended to the usage log rather than rewriting the
+        block file. It is counted whenever the block is read and folded into
+        the file on the block's next save or by compact_usage().
+        """
+        if self._buffer is not None and block_id in self._buffer:
+            # The block is about to be written anyway
+            block = self.get_block(block_id)
+            block['usage_count'] = block.get('usage_count', 0) + 1
+            self._buffer[block_id] = block
+            return _copy_block(block)
+        
         block = self.get_block(block_id)
         if not block:
             return None
         
-        block['usage_count'] = block.get('usage_count', 0) + 1
-        self._save_block(block)
+        with open(self.usage_log_path, 'ab') as f:
+            if f.tell() == 0:
+                # New log; blocks marked with another generation count all of it
+                f.write(orjson.dumps({'gen': os.urandom(4).hex()}) + b'\n')
+            f.write(orjson.dumps({'id': block_id, 'ts': time.time_ns()}) + b'\n')
+        
+        # Read the block again so the copy returned and its usage mark both
+        # include the new line; saving it then won't count the line twice
+        return self.get_block(block_id, block['domain'])
+    
+    def _sync_usage(self):
+        """Read usage log lines appended since the last sync."""
+        try:
+            f = open(self.usage_log_path, 'rb')
+        except FileNotFoundError:
+            self._usage_gen, self._usage_file, self._usage_offset = None, None, 0
+            self._usage_positions = {}
+            return
+        
+        with f:
+            st = os.fstat(f.fileno())
+            if (st.st_dev, st.st_ino) != self._usage_file or st.st_size < self._usage_offset:
+                # The log was replaced by compact_usage(), possibly in another process
+                self._usage_gen, self._usage_file, self._usage_offset = None, (st.st_dev, st.st_ino), 0
+                self._usage_positions = {}
+            if st.st_size == self._usage_offset:
+                return
+            
+            f.seek(self._usage_offset)
+            position = self._usage_offset
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Still being written
+                    break
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    entry = {}
+                if position == 0 and 'gen' in entry:
+                    self._usage_gen = entry['gen']
+                elif 'id' in entry:
+                    self._usage_positions.setdefault(entry['id'], []).append(position)
+                position += len(line)
+            self._usage_offset = position
+    
+    def _pending_usage(self, block_id: str, usage_mark: Optional[list], end: Optional[int] = None) -> int:
+        """Count logged increments for a block after its usage mark (and before end)."""
+        positions = self._usage_positions.get(block_id)
+        if not positions:
+            return 0
+        start = 0
+        if usage_mark and usage_mark[0] == self._usage_gen:
+            start = bisect.bisect_left(positions, usage_mark[1])
+        stop = len(positions) if end is None else bisect.bisect_left(positions, end)
+        return max(0, stop - start)
+    
+    def _apply_usage(self, block: Dict[str, Any]) -> Dict[str, Any]:
+        """Add pending logged increments to a block read from disk."""
+        usage_mark = block.pop('_usage_log', None)
+        pending = self._pending_usage(block.get('id'), usage_mark)
+        if pending:
+            block['usage_count'] = block.get('usage_count', 0) + pending
         return block
     
-    def export_blocks(self, format: str = 'json') -> str:
-        """Export all knowledge blocks."""
-        all_blocks = []
-        domains = ["defense", "proactive", "mindset", "efficiency", "relationship"]
+    def compact_usage(self):
+        """Fold logged usage increments into their block files and start a new log.
         
-        for domain in domains:
-            domain_dir = os.path.join(self.data_dir, domain)
-            if not os.path.exists(domain_dir):
+        Each block file records how far into the log its count goes, so an
+        interrupted compaction never counts an increment twice. Increments
+        appended by another process while the log is being swapped out can
+        be lost.
+        """
+        self._sync_usage()
+        gen, end = self._usage_gen, self._usage_offset
+        if self._usage_file is None:
+            return
+        
+        for block_id in list(self._usage_positions):
+            for domain in _DOMAINS:
+                block = _load_json_file(os.path.join(self.data_dir, domain, f"{block_id}.json"))
+                if block is not None:
+                    break
+            else:
                 continue
-            
-            for filename in os.listdir(domain_dir):
-                if not filename.endswith('.json'):
-                    continue
-                
-                file_path = os.path.join(domain_dir, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    try:
-                        block = json.load(f)
-                        all_blocks.append(block)
-                    except json.JSONDecodeError:
-                        continue
+            pending = self._pending_usage(block_id, block.pop('_usage_log', None), end)
+            if not pending:
+                continue
+            block['usage_count'] = block.get('usage_count', 0) + pending
+            self._usage_marks[block_id] = (gen, end)
+            self._write_to_disk(block)
+        
+        # Carry over anything appended since the sync into a new generation
+        with open(self.usage_log_path, 'rb') as f:
+            f.seek(end)
+            tail = f.read()
+        tail = tail[:tail.rfind(b'\n') + 1]
+        tmp_path = f"{self.usage_log_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps({'gen': os.urandom(4).hex()}) + b'\n' + tail)
+        os.replace(tmp_path, self.usage_log_path)
+    
+    def export_blocks(self, format: str = 'json') -> str:
+        """Export all knowledge blocks."""
+        all_blocks = self._scan_blocks(_DOMAINS)
         
         if format == 'json':
-            return json.dumps(all_blocks, ensure_ascii=False, indent=2)
+            return orjson.dumps(all_blocks, option=orjson.OPT_INDENT_2).decode()
         elif format == 'markdown':
             # Generate markdown
-            markdown = "# Creative-Career-OS Knowledge Blocks\n\n"
+            parts = ["# Creative-Career-OS Knowledge Blocks\n\n"]
+            parts_append = parts.append
             for block in all_blocks:
-                markdown += f"## {block.get('title', 'Untitled')}\n"
-                markdown += f"ID: {block.get('id', 'N/A')}\n"
-                markdown += f"Domain: {block.get('domain', 'N/A')}\n"
-                markdown += f"Type: {block.get('type', 'N/A')}\n"
-                markdown += f"Rating: {block.get('rating', 'N/A')}\n"
-                markdown += f"Usage: {block.get('usage_count', 0)}\n\n"
-                markdown += f"{block.get('content', 'No content')}\n\n"
-                markdown += "---\n\n"
-            return markdown
+                parts_append(
+                    f"## {block.get('title', 'Untitled')}\n"
+                    f"ID: {block.get('id', 'N/A')}\n"
+                    f"Domain: {block.get('domain', 'N/A')}\n"
+                    f"Type: {block.get('type', 'N/A')}\n"
+                    f"Rating: {block.get('rating', 'N/A')}\n"
+                    f"Usage: {block.get('usage_count', 0)}\n\n"
+                    f"{block.get('content', 'No content')}\n\n"
+                    "---\n\n"
+                )
+            return ''.join(parts)
         else:
             raise ValueError(f"Unsupported format: {format}")
 
@@ -318,7 +714,7 @@ if __name__ == "__main__":
     parser.add_argument('command', choices=['create', 'get', 'update', 'delete', 'search', 'list', 'export'],
                         help='Command to execute')
     parser.add_argument('--title', help='Title for creating a block')
-    parser.add_argument('--domain', choices=['defense', 'proactive', 'mindset', 'efficiency', 'relationship'],
+    parser.add_argument('--domain', choices=_DOMAINS,
                         help='Domain for the block')
     parser.add_argument('--type', choices=['case', 'module', 'guide', 'tool', 'case_study'],
                         help='Type of the block')
@@ -343,14 +739,14 @@ if __name__ == "__main__":
         }
         block = manager.create_block(block_data)
         print(f"Created block: {block['id']}")
-        print(json.dumps(block, ensure_ascii=False, indent=2))
+        print(orjson.dumps(block, option=orjson.OPT_INDENT_2).decode())
     
     elif args.command == 'get':
         if not args.id:
             parser.error('Get command requires --id')
         block = manager.get_block(args.id)
         if block:
-            print(json.dumps(block, ensure_ascii=False, indent=2))
+            print(orjson.dumps(block, option=orjson.OPT_INDENT_2).decode())
         else:
             print(f"Block not found: {args.id}")
     
@@ -361,7 +757,7 @@ if __name__ == "__main__":
         block = manager.increment_usage(args.id)
         if block:
             print(f"Updated block: {args.id}")
-            print(json.dumps(block, ensure_ascii=False, indent=2))
+            print(orjson.dumps(block, option=orjson.OPT_INDENT_2).decode())
         else:
             print(f"Block not found: {args.id}")
     
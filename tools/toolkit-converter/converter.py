@@ -5,12 +5,14 @@
 """
 
 import os
-import json
 import re
 import datetime
-import uuid
+import hashlib
+import time
 from pathlib import Path
 
+import orjson
+
 # 工具包目录 (相对于脚本所在目录)
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent.parent
@@ -18,6 +20,15 @@ TOOLKITS_DIR = PROJECT_ROOT / "toolkits"
 # 输出目录
 OUTPUT_DIR = PROJECT_ROOT / "knowledge_blocks"
 
+# 标题转ID时需要替换的字符
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+# 带版本号的标题行, 如 "# 合同-付款节点设置 v1.0"
+_TITLE_RE = re.compile(r'^#\s*(.+?)\s*v\d+\.\d+', re.MULTILINE)
+# 元信息列表块
+_META_RE = re.compile(r'## 元信息\n(- \*\*[^\*]+\*\*: .+\n)+', re.MULTILINE)
+# 文件开头的标题行
+_HEADER_RE = re.compile(r'^#\s*.+?v\d+\.\d+\n\n')
+
 # 领域映射
 domain_map = {
     "主动": "proactive",
@@ -29,6 +40,9 @@ domain_map = {
     "沟通": "defense"
 }
 
+# 各领域的输出目录 (按首次出现顺序去重)
+_DOMAIN_DIRS = {domain: OUTPUT_DIR / domain for domain in dict.fromkeys(domain_map.values())}
+
 # 类型映射
 type_map = {
     "个人品牌建设": "module",
@@ -59,9 +73,10 @@ type_map = {
 def generate_id(title: str) -> str:
     """生成知识块ID"""
     # 生成基于时间戳和标题的唯一ID
-    timestamp = datetime.datetime.now().timestamp()
-    unique_id = str(uuid.uuid4())[:8]
-    title_slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')[:20]
+    hash_obj = hashlib.blake2b(title.encode('utf-8'), digest_size=4)
+    hash_obj.update(time.monotonic_ns().to_bytes(8, 'little'))
+    unique_id = hash_obj.hexdigest()
+    title_slug = _SLUG_RE.sub('-', title.lower()).strip('-')[:20]
     return f"{title_slug}_{unique_id}"
 
 def parse_toolkit(file_path: Path) -> dict:
@@ -70,23 +85,23 @@ def parse_toolkit(file_path: Path) -> dict:
         content = f.read()
     
     # 提取标题
-    title_match = re.search(r'^#\s*(.+?)\s*v\d+\.\d+', content, re.MULTILINE)
+    title_match = _TITLE_RE.search(content)
     title = title_match.group(1) if title_match else "Untitled"
     
     # 提取元信息
     meta_info = {}
-    meta_match = re.search(r'## 元信息\n(- \*\*[^\*]+\*\*: .+\n)+', content, re.MULTILINE)
+    meta_match = _META_RE.search(content)
     if meta_match:
         meta_text = meta_match.group(0)
         for line in meta_text.split('\n'):
             if '- **' in line:
                 key, value = line.split(': ', 1)
-                key = key.strip('- **').strip('**')
+                key = key.split('**')[1]
                 meta_info[key] = value.strip()
     
     # 提取核心内容
-    core_content = re.sub(r'## 元信息\n(- \*\*[^\*]+\*\*: .+\n)+', '', content)
-    core_content = re.sub(r'^#\s*.+?v\d+\.\d+\n\n', '', core_content)
+    core_content = _META_RE.sub('', content)
+    core_content = _HEADER_RE.sub('', core_content)
     
     # 提取领域和类型
     domain_key = title.split('-')[0].strip()
@@ -138,8 +153,7 @@ def main():
     OUTPUT_DIR.mkdir(exist_ok=True)
     print(f"创建输出目录: {OUTPUT_DIR}")
     
-    for domain in domain_map.values():
-        domain_dir = OUTPUT_DIR / domain
+    for domain_dir in _DOMAIN_DIRS.values():
         domain_dir.mkdir(exist_ok=True)
         print(f"创建领域目录: {domain_dir}")
     
@@ -154,11 +168,11 @@ def main():
             print(f"  类型: {block['type']}")
             
             # 保存为JSON文件
-            output_file = OUTPUT_DIR / block["domain"] / f"{block['id']}.json"
+            output_file = _DOMAIN_DIRS[block["domain"]] / f"{block['id']}.json"
             print(f"  保存到: {output_file}")
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(block, f, ensure_ascii=False, indent=2)
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(block, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             
             print(f"  转换成功!")
         except Exception as e: